@@ -0,0 +1,281 @@
+"""
+Ledger core for the Green Hydrogen Credit (GHC) System: transactions, blocks,
+the chain and its incrementally maintained aggregates. Kept free of Streamlit
+so it can be imported and tested on its own.
+"""
+
+import hashlib
+import json
+import secrets
+from datetime import datetime
+from types import MappingProxyType
+
+class Transaction:
+    """Blockchain transaction with Ethereum-style structure"""
+    
+    def __init__(self, from_address, to_address, amount, tx_type, data=None, wallet=None):
+        self.from_address = from_address
+        self.to_address = to_address
+        self.amount = amount
+        self.tx_type = tx_type
+        self.data = data or {}
+        self.timestamp = datetime.now().isoformat()
+        self.nonce = secrets.randbelow(1000000)
+        
+        # Create transaction hash
+        tx_string = f"{from_address}{to_address}{amount}{tx_type}{self.timestamp}{self.nonce}"
+        self.tx_hash = "0x" + hashlib.sha256(tx_string.encode()).hexdigest()
+        
+        # Sign transaction if wallet provided
+        self.signature = None
+        if wallet and from_address != "SYSTEM":
+            self.signature = wallet.sign_message(tx_string)
+
+class Block:
+    """Ethereum-style block"""
+    
+    def __init__(self, transactions, previous_hash="0x0"):
+        self.transactions = transactions
+        self.timestamp = datetime.now().isoformat()
+        self.previous_hash = previous_hash
+        self.block_number = 0
+        self.nonce = 0
+        self.hash = self.calculate_hash()
+    
+    def calculate_hash(self):
+        """Calculate block hash"""
+        block_string = json.dumps({
+            "transactions": [tx.__dict__ for tx in self.transactions],
+            "timestamp": self.timestamp,
+            "previous_hash": self.previous_hash,
+            "nonce": self.nonce
+        }, sort_keys=True)
+        return "0x" + hashlib.sha256(block_string.encode()).hexdigest()
+
+class LedgerAggregates:
+    """Supply and per-wallet aggregates, updated once per mined block"""
+    
+    STAT_FIELDS = ('issued', 'received', 'sent', 'retired')
+    
+    def __init__(self):
+        self._balances = {}
+        self.wallet_stats = {}
+        # Per-wallet credits by energy source, oldest source first
+        self.holdings = {}
+        self.issued_by_source = {}
+        self.supply_by_source = {}
+        self.holders_by_source = {}
+        self.source_supply_sum = 0
+        self.holder_count = 0
+        self.balance_sum = 0
+        self.total_issued = 0
+        self.total_retired = 0
+    
+    @property
+    def balances(self):
+        """Read-only view; balances only change through apply_block"""
+        return MappingProxyType(self._balances)
+    
+    def _stats(self, address):
+        return self.wallet_stats.setdefault(address, dict.fromkeys(self.STAT_FIELDS, 0))
+    
+    def _credit(self, address, amount):
+        previous = self._balances.get(address, 0)
+        self._balances[address] = previous + amount
+        self.balance_sum += self._balances[address] - previous
+        if previous <= 0 < self._balances[address]:
+            self.holder_count += 1
+    
+    def _debit(self, address, amount):
+        previous = self._balances.get(address, 0)
+        self._balances[address] = previous - amount
+        self.balance_sum += self._balances[address] - previous
+        if self._balances[address] <= 0 < previous:
+            self.holder_count -= 1
+    
+    def _add_holding(self, address, source, amount):
+        holdings = self.holdings.setdefault(address, {})
+        if source not in holdings:
+            self.holders_by_source[source] = self.holders_by_source.get(source, 0) + 1
+        holdings[source] = holdings.get(source, 0) + amount
+    
+    def _spend_holdings(self, address, amount):
+        """Take amount from a wallet's holdings, oldest energy source first"""
+        holdings = self.holdings.get(address, {})
+        spent = []
+        for source in list(holdings):
+            if amount == 0:
+                break
+            taken = min(amount, holdings[source])
+            holdings[source] -= taken
+            amount -= taken
+            spent.append((source, taken))
+            if holdings[source] == 0:
+                del holdings[source]
+                self.holders_by_source[source] -= 1
+        return spent
+    
+    def validate_block(self, block):
+        """Reject a block that would overdraw a wallet, without changing any aggregates"""
+        deltas = {}
+        for tx in block.transactions:
+            if tx.amount <= 0:
+                raise ValueError(f"Invalid amount {tx.amount} in transaction {tx.tx_hash}")
+            if tx.tx_type == "issue":
+                deltas[tx.to_address] = deltas.get(tx.to_address, 0) + tx.amount
+            elif tx.tx_type in ("transfer", "retire"):
+                available = self.get_balance(tx.from_address) + deltas.get(tx.from_address, 0)
+                if available < tx.amount:
+                    raise ValueError(f"Insufficient balance for transaction {tx.tx_hash}")
+                deltas[tx.from_address] = deltas.get(tx.from_address, 0) - tx.amount
+                if tx.tx_type == "transfer":
+                    deltas[tx.to_address] = deltas.get(tx.to_address, 0) + tx.amount
+            else:
+                raise ValueError(f"Unknown transaction type {tx.tx_type}")
+    
+    def apply_block(self, block):
+        """Fold a newly mined block's transactions into the aggregates"""
+        self.validate_block(block)
+        
+        for tx in block.transactions:
+            if tx.tx_type == "issue":
+                source = tx.data.get("energy_source", "Unspecified")
+                self._credit(tx.to_address, tx.amount)
+                self._add_holding(tx.to_address, source, tx.amount)
+                self._stats(tx.to_address)['issued'] += tx.amount
+                self.total_issued += tx.amount
+                self.issued_by_source[source] = self.issued_by_source.get(source, 0) + tx.amount
+                self.supply_by_source[source] = self.supply_by_source.get(source, 0) + tx.amount
+                self.source_supply_sum += tx.amount
+            elif tx.tx_type == "transfer":
+                self._debit(tx.from_address, tx.amount)
+                self._credit(tx.to_address, tx.amount)
+                for source, amount in self._spend_holdings(tx.from_address, tx.amount):
+                    self._add_holding(tx.to_address, source, amount)
+                self._stats(tx.from_address)['sent'] += tx.amount
+                self._stats(tx.to_address)['received'] += tx.amount
+            elif tx.tx_type == "retire":
+                self._debit(tx.from_address, tx.amount)
+                for source, amount in self._spend_holdings(tx.from_address, tx.amount):
+                    self.supply_by_source[source] -= amount
+                    self.source_supply_sum -= amount
+                self._stats(tx.from_address)['retired'] += tx.amount
+                self.total_retired += tx.amount
+        
+        # validate_block rejects anything that could unbalance the ledger, so
+        # failing here means the aggregates' own bookkeeping is broken
+        if not self.is_conserved():
+            raise RuntimeError(f"Supply conservation violated by block #{block.block_number}")
+    
+    @property
+    def active_supply(self):
+        return self.total_issued - self.total_retired
+    
+    def is_conserved(self):
+        """Check that balances and per-source supply both sum to issued minus retired credits"""
+        return self.balance_sum == self.active_supply == self.source_supply_sum
+    
+    def get_balance(self, address):
+        return self._balances.get(address, 0)
+    
+    def get_wallet_stats(self, address):
+        """Issued/received/sent/retired counters and current balance for a wallet"""
+        stats = dict.fromkeys(self.STAT_FIELDS, 0)
+        stats.update(self.wallet_stats.get(address, {}))
+        stats['balance'] = self.get_balance(address)
+        return stats
+
+class GreenHydrogenBlockchain:
+    """Ethereum-compatible Green Hydrogen Credit blockchain"""
+    
+    def __init__(self):
+        self.chain = [self.create_genesis_block()]
+        self.aggregates = LedgerAggregates()
+        self.pending_transactions = []
+        self.certificates = {}
+    
+    @property
+    def balances(self):
+        return self.aggregates.balances
+    
+    @property
+    def total_issued(self):
+        return self.aggregates.total_issued
+    
+    @property
+    def total_retired(self):
+        return self.aggregates.total_retired
+    
+    def create_genesis_block(self):
+        """Create the first block"""
+        genesis = Block([], "0x0")
+        genesis.block_number = 0
+        return genesis
+    
+    def get_latest_block(self):
+        return self.chain[-1]
+    
+    def add_certificate(self, certificate):
+        """Add verified e-certificate"""
+        self.certificates[certificate.certificate_id] = certificate
+    
+    def issue_credits(self, certificate, wallet=None):
+        """Issue GHC credits based on valid e-certificate"""
+        if not certificate.is_valid():
+            raise ValueError("Invalid e-certificate")
+        
+        producer_address = certificate.production_record.producer_address
+        amount = certificate.production_record.hydrogen_kg
+        
+        tx = Transaction(
+            from_address="SYSTEM",
+            to_address=producer_address,
+            amount=amount,
+            tx_type="issue",
+            data={
+                "certificate_id": certificate.certificate_id,
+                "energy_source": certificate.production_record.energy_source
+            }
+        )
+        
+        self.pending_transactions.append(tx)
+        self.mine_pending_transactions()
+        
+        return tx.tx_hash
+    
+    def transfer_credits(self, from_address, to_address, amount, wallet):
+        """Transfer GHC credits"""
+        if self.balances.get(from_address, 0) < amount:
+            raise ValueError("Insufficient balance")
+        
+        tx = Transaction(from_address, to_address, amount, "transfer", wallet=wallet)
+        self.pending_transactions.append(tx)
+        self.mine_pending_transactions()
+        
+        return tx.tx_hash
+    
+    def retire_credits(self, address, amount, wallet):
+        """Retire GHC credits"""
+        if self.balances.get(address, 0) < amount:
+            raise ValueError("Insufficient balance")
+        
+        tx = Transaction(address, "0x000000000000000000000000000000000000dEaD", amount, "retire", wallet=wallet)
+        self.pending_transactions.append(tx)
+        self.mine_pending_transactions()
+        
+        return tx.tx_hash
+    
+    def mine_pending_transactions(self):
+        """Mine pending transactions into a block"""
+        if not self.pending_transactions:
+            return
+        
+        block = Block(self.pending_transactions, self.get_latest_block().hash)
+        block.block_number = len(self.chain)
+        self.pending_transactions = []
+        # Invalid blocks are rejected by the aggregates before reaching the chain
+        self.aggregates.apply_block(block)
+        self.chain.append(block)
+    
+    def get_balance(self, address):
+        return self.aggregates.get_balance(address)
@@ -9,15 +9,19 @@ A blockchain-based system for tracking green hydrogen credits with government ve
 import streamlit as st
 import hashlib
 import json
+import os
+import tempfile
+import threading
 import time
+from collections import deque
 from datetime import datetime
 from web3 import Web3
 from eth_account import Account
-import secrets
 import pandas as pd
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding
+from ghc_ledger import GreenHydrogenBlockchain
 
 # Configure Streamlit page
 st.set_page_config(
@@ -26,12 +30,54 @@ st.set_page_config(
     layout="wide"
 )
 
+# Opt-in: when set, certifier keys are persisted here so new sessions skip RSA
+# key generation. The file holds unencrypted private keys, and "Reset System"
+# keeps the same certifier identity while it exists.
+CERTIFIER_KEY_FILE = os.environ.get("GHC_CERTIFIER_KEY_FILE")
+
+class KeyPool:
+    """Pool of pre-generated Ethereum accounts refilled by a background thread"""
+    
+    def __init__(self, size=64):
+        self.size = size
+        self._accounts = deque()
+        self._refill = threading.Event()
+        self._refill.set()
+        self._thread = threading.Thread(target=self._run, name="ghc-key-pool", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        """Top the pool back up to its target size whenever keys are taken"""
+        while True:
+            self._refill.wait()
+            self._refill.clear()
+            while len(self._accounts) < self.size:
+                self._accounts.append(Account.create())
+    
+    def take(self):
+        """Take a pre-generated account, creating one inline if the pool is empty"""
+        try:
+            account = self._accounts.popleft()
+        except IndexError:
+            account = Account.create()
+        self._refill.set()
+        return account
+    
+    def take_many(self, count):
+        """Take several accounts at once"""
+        return [self.take() for _ in range(count)]
+
+@st.cache_resource
+def get_key_pool():
+    """Shared key pool, kept alive across reruns and sessions"""
+    return KeyPool()
+
 class EthereumWallet:
     """Real Ethereum wallet functionality"""
     
-    def __init__(self, name=None):
-        # Generate new account or use existing
-        self.account = Account.create()
+    def __init__(self, name=None, account=None):
+        # Use the given account or take a pre-generated one from the pool
+        self.account = account or get_key_pool().take()
         self.address = self.account.address
         self.private_key = self.account.key.hex()
         self.name = name or f"User_{self.address[:6]}"
@@ -65,19 +111,85 @@ class EthereumWallet:
             print(f"Signature verification error: {e}")
             return False
 
+def create_wallets(names):
+    """Create one wallet per name in bulk, drawing keys from the shared pool"""
+    names = list(names)
+    accounts = get_key_pool().take_many(len(names))
+    return {name: EthereumWallet(name, account) for name, account in zip(names, accounts)}
+
 class DigitalCertifier:
     """Government digital certifier with RSA signatures"""
     
-    def __init__(self, name):
+    def __init__(self, name, private_key=None, wallet=None):
         self.name = name
-        self.wallet = EthereumWallet(name)
+        self.wallet = wallet or EthereumWallet(name)
         # RSA keys for official government certification
-        self.private_key = rsa.generate_private_key(
+        self.private_key = private_key or rsa.generate_private_key(
             public_exponent=65537,
             key_size=2048,
         )
         self.public_key = self.private_key.public_key()
     
+    @classmethod
+    def from_key_file(cls, name, key_file):
+        """Create certifier from keys saved by save_keys"""
+        with open(key_file) as f:
+            try:
+                keys = json.load(f)
+                private_key = serialization.load_pem_private_key(
+                    keys["rsa_private_key"].encode('utf-8'),
+                    password=None
+                )
+                wallet = EthereumWallet.from_private_key(keys["wallet_private_key"], name)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                raise ValueError(f"Certifier key file {key_file} is unreadable: {e}") from e
+        if not isinstance(private_key, rsa.RSAPrivateKey):
+            raise ValueError(f"Certifier key file {key_file} does not contain an RSA private key")
+        return cls(name, private_key, wallet)
+    
+    @classmethod
+    def load_or_create(cls, name, key_file):
+        """Load certifier keys from key_file, generating and saving them only if it does not exist"""
+        try:
+            return cls.from_key_file(name, key_file)
+        except FileNotFoundError:
+            pass
+        
+        certifier = cls(name)
+        try:
+            certifier.save_keys(key_file)
+        except FileExistsError:
+            # Another session saved its keys first; use those so all sessions agree
+            return cls.from_key_file(name, key_file)
+        return certifier
+    
+    def save_keys(self, key_file):
+        """Persist RSA and wallet keys so later sessions can reuse them"""
+        pem = self.private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+        keys = {
+            "rsa_private_key": pem.decode('utf-8'),
+            "wallet_private_key": self.wallet.private_key
+        }
+        # Write a private (0o600) temp file, then link it into place only if
+        # key_file is still absent (FileExistsError otherwise), so readers never
+        # see a half-written file and existing keys are never overwritten
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(key_file)), suffix=".tmp")
+        try:
+            try:
+                f = os.fdopen(fd, 'w')
+            except BaseException:
+                os.close(fd)
+                raise
+            with f:
+                json.dump(keys, f)
+            os.link(tmp_path, key_file)
+        finally:
+            os.unlink(tmp_path)
+    
     def sign_certificate(self, data):
         """Sign certificate data with RSA key"""
         data_bytes = json.dumps(data, sort_keys=True).encode('utf-8')
@@ -160,141 +272,6 @@ class ECertificate:
         """Verify if the e-certificate is valid"""
         return self.certifier.verify_certificate_signature(self.cert_data, self.signature)
 
-class Transaction:
-    """Blockchain transaction with Ethereum-style structure"""
-    
-    def __init__(self, from_address, to_address, amount, tx_type, data=None, wallet=None):
-        self.from_address = from_address
-        self.to_address = to_address
-        self.amount = amount
-        self.tx_type = tx_type
-        self.data = data or {}
-        self.timestamp = datetime.now().isoformat()
-        self.nonce = secrets.randbelow(1000000)
-        
-        # Create transaction hash
-        tx_string = f"{from_address}{to_address}{amount}{tx_type}{self.timestamp}{self.nonce}"
-        self.tx_hash = "0x" + hashlib.sha256(tx_string.encode()).hexdigest()
-        
-        # Sign transaction if wallet provided
-        self.signature = None
-        if wallet and from_address != "SYSTEM":
-            self.signature = wallet.sign_message(tx_string)
-
-class Block:
-    """Ethereum-style block"""
-    
-    def __init__(self, transactions, previous_hash="0x0"):
-        self.transactions = transactions
-        self.timestamp = datetime.now().isoformat()
-        self.previous_hash = previous_hash
-        self.block_number = 0
-        self.nonce = 0
-        self.hash = self.calculate_hash()
-    
-    def calculate_hash(self):
-        """Calculate block hash"""
-        block_string = json.dumps({
-            "transactions": [tx.__dict__ for tx in self.transactions],
-            "timestamp": self.timestamp,
-            "previous_hash": self.previous_hash,
-            "nonce": self.nonce
-        }, sort_keys=True)
-        return "0x" + hashlib.sha256(block_string.encode()).hexdigest()
-
-class GreenHydrogenBlockchain:
-    """Ethereum-compatible Green Hydrogen Credit blockchain"""
-    
-    def __init__(self):
-        self.chain = [self.create_genesis_block()]
-        self.balances = {}
-        self.pending_transactions = []
-        self.certificates = {}
-        self.total_issued = 0
-        self.total_retired = 0
-    
-    def create_genesis_block(self):
-        """Create the first block"""
-        genesis = Block([], "0x0")
-        genesis.block_number = 0
-        return genesis
-    
-    def get_latest_block(self):
-        return self.chain[-1]
-    
-    def add_certificate(self, certificate):
-        """Add verified e-certificate"""
-        self.certificates[certificate.certificate_id] = certificate
-    
-    def issue_credits(self, certificate, wallet=None):
-        """Issue GHC credits based on valid e-certificate"""
-        if not certificate.is_valid():
-            raise ValueError("Invalid e-certificate")
-        
-        producer_address = certificate.production_record.producer_address
-        amount = certificate.production_record.hydrogen_kg
-        
-        tx = Transaction(
-            from_address="SYSTEM",
-            to_address=producer_address,
-            amount=amount,
-            tx_type="issue",
-            data={"certificate_id": certificate.certificate_id}
-        )
-        
-        self.pending_transactions.append(tx)
-        self.mine_pending_transactions()
-        
-        if producer_address not in self.balances:
-            self.balances[producer_address] = 0
-        self.balances[producer_address] += amount
-        self.total_issued += amount
-        
-        return tx.tx_hash
-    
-    def transfer_credits(self, from_address, to_address, amount, wallet):
-        """Transfer GHC credits"""
-        if self.balances.get(from_address, 0) < amount:
-            raise ValueError("Insufficient balance")
-        
-        tx = Transaction(from_address, to_address, amount, "transfer", wallet=wallet)
-        self.pending_transactions.append(tx)
-        self.mine_pending_transactions()
-        
-        self.balances[from_address] -= amount
-        if to_address not in self.balances:
-            self.balances[to_address] = 0
-        self.balances[to_address] += amount
-        
-        return tx.tx_hash
-    
-    def retire_credits(self, address, amount, wallet):
-        """Retire GHC credits"""
-        if self.balances.get(address, 0) < amount:
-            raise ValueError("Insufficient balance")
-        
-        tx = Transaction(address, "0x000000000000000000000000000000000000dEaD", amount, "retire", wallet=wallet)
-        self.pending_transactions.append(tx)
-        self.mine_pending_transactions()
-        
-        self.balances[address] -= amount
-        self.total_retired += amount
-        
-        return tx.tx_hash
-    
-    def mine_pending_transactions(self):
-        """Mine pending transactions into a block"""
-        if not self.pending_transactions:
-            return
-        
-        block = Block(self.pending_transactions, self.get_latest_block().hash)
-        block.block_number = len(self.chain)
-        self.chain.append(block)
-        self.pending_transactions = []
-    
-    def get_balance(self, address):
-        return self.balances.get(address, 0)
-
 # Initialize session state
 if 'blockchain' not in st.session_state:
     st.session_state.blockchain = GreenHydrogenBlockchain()
@@ -303,7 +280,16 @@ if 'wallets' not in st.session_state:
     st.session_state.wallets = {}
 
 if 'government_certifier' not in st.session_state:
-    st.session_state.government_certifier = DigitalCertifier("Energy Regulatory Authority")
+    if CERTIFIER_KEY_FILE:
+        try:
+            st.session_state.government_certifier = DigitalCertifier.load_or_create(
+                "Energy Regulatory Authority", CERTIFIER_KEY_FILE
+            )
+        except ValueError as e:
+            st.error(f"Cannot load government certifier keys: {e}. Restore or remove the key file.")
+            st.stop()
+    else:
+        st.session_state.government_certifier = DigitalCertifier("Energy Regulatory Authority")
 
 # Main Streamlit App
 def main():
@@ -331,11 +317,16 @@ def main():
         # Display existing wallets
         if st.session_state.wallets:
             st.subheader("Active Wallets")
+            aggregates = st.session_state.blockchain.aggregates
             for name, wallet_info in st.session_state.wallets.items():
-                balance = st.session_state.blockchain.get_balance(wallet_info['wallet'].address)
+                stats = aggregates.get_wallet_stats(wallet_info['wallet'].address)
                 st.write(f"**{name}** ({wallet_info['type']})")
                 st.write(f"`{wallet_info['wallet'].address[:10]}...`")
-                st.write(f"Balance: {balance} GHC")
+                st.write(f"Balance: {stats['balance']} GHC")
+                st.caption(
+                    f"Issued {stats['issued']} · Received {stats['received']} · "
+                    f"Sent {stats['sent']} · Retired {stats['retired']}"
+                )
                 st.divider()
     
     # Main tabs
@@ -349,17 +340,19 @@ def main():
     
     with tab1:
         st.header("System Dashboard")
+        aggregates = st.session_state.blockchain.aggregates
         
-        col1, col2, col3, col4 = st.columns(4)
+        col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
             st.metric("Total Wallets", len(st.session_state.wallets))
         with col2:
-            st.metric("Total Issued", f"{st.session_state.blockchain.total_issued} GHC")
+            st.metric("Total Issued", f"{aggregates.total_issued} GHC")
         with col3:
-            st.metric("Total Retired", f"{st.session_state.blockchain.total_retired} GHC")
+            st.metric("Total Retired", f"{aggregates.total_retired} GHC")
         with col4:
-            active_credits = st.session_state.blockchain.total_issued - st.session_state.blockchain.total_retired
-            st.metric("Active Credits", f"{active_credits} GHC")
+            st.metric("Active Credits", f"{aggregates.active_supply} GHC")
+        with col5:
+            st.metric("Credit Holders", aggregates.holder_count)
         
         # Government Certifier Info
         st.subheader("🏛️ Government Certifier")
@@ -373,7 +366,7 @@ def main():
             st.subheader("💰 Current Balances")
             balance_data = []
             for name, wallet_info in st.session_state.wallets.items():
-                balance = st.session_state.blockchain.get_balance(wallet_info['wallet'].address)
+                balance = aggregates.get_balance(wallet_info['wallet'].address)
                 if balance > 0:
                     balance_data.append({
                         'Wallet': name,
@@ -387,6 +380,21 @@ def main():
                 st.dataframe(df, use_container_width=True)
             else:
                 st.info("No active balances to display")
+        
+        # Supply by energy source
+        if aggregates.issued_by_source:
+            st.subheader("⚡ Supply by Energy Source")
+            source_df = pd.DataFrame([
+                {
+                    'Energy Source': source,
+                    'Issued (GHC)': issued,
+                    'Active (GHC)': aggregates.supply_by_source.get(source, 0),
+                    'Holders': aggregates.holders_by_source.get(source, 0)
+                }
+                for source, issued in aggregates.issued_by_source.items()
+            ])
+            st.bar_chart(source_df.set_index('Energy Source')['Active (GHC)'])
+            st.dataframe(source_df, use_container_width=True)
     
     with tab2:
         st.header("🏭 Production & Certification")
@@ -467,7 +475,7 @@ def main():
                 to_wallet = st.selectbox("To Wallet", wallet_names, key="transfer_to")
                 
                 if from_wallet:
-                    from_balance = st.session_state.blockchain.get_balance(
+                    from_balance = st.session_state.blockchain.aggregates.get_balance(
                         st.session_state.wallets[from_wallet]['wallet'].address
                     )
                     st.write(f"Available Balance: {from_balance} GHC")
@@ -530,9 +538,10 @@ def main():
             
             with col1:
                 # Filter wallets with balance > 0
+                aggregates = st.session_state.blockchain.aggregates
                 wallets_with_balance = {
                     name: info for name, info in st.session_state.wallets.items()
-                    if st.session_state.blockchain.get_balance(info['wallet'].address) > 0
+                    if aggregates.get_balance(info['wallet'].address) > 0
                 }
                 
                 if not wallets_with_balance:
@@ -541,7 +550,7 @@ def main():
                     selected_wallet = st.selectbox("Select Wallet", list(wallets_with_balance.keys()))
                     
                     wallet_obj = wallets_with_balance[selected_wallet]['wallet']
-                    current_balance = st.session_state.blockchain.get_balance(wallet_obj.address)
+                    current_balance = aggregates.get_balance(wallet_obj.address)
                     st.write(f"Current Balance: {current_balance} GHC")
                     
                     retire_amount = st.number_input(
@@ -585,7 +594,7 @@ def main():
                     st.dataframe(df, use_container_width=True)
                     
                     # Environmental impact
-                    total_retired = sum(int(tx['Amount'].split()[0]) for tx in retirement_txs)
+                    total_retired = st.session_state.blockchain.aggregates.total_retired
                     st.info(f"🌍 Total Environmental Impact: {total_retired} kg of verified green hydrogen consumed")
                 else:
                     st.info("No retirements yet")
@@ -648,8 +657,9 @@ with st.sidebar:
     st.markdown("---")
     if st.button("🎯 Load Demo Data"):
         # Create demo wallets
-        producer_wallet = EthereumWallet("Solar Hydrogen Inc")
-        buyer_wallet = EthereumWallet("Green Steel Corp")
+        demo_wallets = create_wallets(["Solar Hydrogen Inc", "Green Steel Corp"])
+        producer_wallet = demo_wallets["Solar Hydrogen Inc"]
+        buyer_wallet = demo_wallets["Green Steel Corp"]
         
         st.session_state.wallets = {
             "Solar Hydrogen Inc": {'wallet': producer_wallet, 'type': 'Producer'},
@@ -666,10 +676,12 @@ with st.sidebar:
         
         certificate = ECertificate(record, st.session_state.government_certifier)
         st.session_state.blockchain.add_certificate(certificate)
-        st.session_state.blockchain.issue_credits(certificate)
-        
-        st.success("Demo data loaded!")
-        st.rerun()
+        try:
+            st.session_state.blockchain.issue_credits(certificate)
+            st.success("Demo data loaded!")
+            st.rerun()
+        except Exception as e:
+            st.error(f"Error loading demo data: {e}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,106 @@
+"""Tests for the GHC ledger aggregates"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from ghc_ledger import GreenHydrogenBlockchain, Transaction
+
+PRODUCER = "0xProducer"
+BUYER = "0xBuyer"
+
+
+def issue(chain, address, amount, energy_source):
+    """Issue credits through a stand-in certificate"""
+    certificate = SimpleNamespace(
+        certificate_id=f"cert-{len(chain.chain)}",
+        production_record=SimpleNamespace(
+            producer_address=address,
+            hydrogen_kg=amount,
+            energy_source=energy_source
+        ),
+        is_valid=lambda: True
+    )
+    return chain.issue_credits(certificate)
+
+
+def test_spends_oldest_source_first():
+    chain = GreenHydrogenBlockchain()
+    issue(chain, PRODUCER, 500, "Solar PV")
+    issue(chain, PRODUCER, 100, "Wind")
+
+    chain.transfer_credits(PRODUCER, BUYER, 550, wallet=None)
+
+    aggregates = chain.aggregates
+    assert aggregates.holdings[PRODUCER] == {"Wind": 50}
+    assert aggregates.holdings[BUYER] == {"Solar PV": 500, "Wind": 50}
+    assert aggregates.supply_by_source == {"Solar PV": 500, "Wind": 100}
+
+
+def test_holders_by_source_rises_and_falls():
+    chain = GreenHydrogenBlockchain()
+    issue(chain, PRODUCER, 500, "Solar PV")
+    issue(chain, PRODUCER, 100, "Wind")
+    assert chain.aggregates.holders_by_source == {"Solar PV": 1, "Wind": 1}
+
+    chain.transfer_credits(PRODUCER, BUYER, 550, wallet=None)
+    assert chain.aggregates.holders_by_source == {"Solar PV": 1, "Wind": 2}
+
+    chain.retire_credits(BUYER, 520, wallet=None)
+    aggregates = chain.aggregates
+    assert aggregates.holders_by_source == {"Solar PV": 0, "Wind": 2}
+    assert aggregates.supply_by_source == {"Solar PV": 0, "Wind": 80}
+    assert aggregates.issued_by_source == {"Solar PV": 500, "Wind": 100}
+    assert aggregates.holder_count == 2
+    assert aggregates.get_wallet_stats(BUYER) == {
+        'issued': 0, 'received': 550, 'sent': 0, 'retired': 520, 'balance': 30
+    }
+    assert aggregates.is_conserved()
+
+
+def test_rejects_overdraft_within_one_block():
+    chain = GreenHydrogenBlockchain()
+    issue(chain, PRODUCER, 100, "Solar PV")
+
+    # Each transfer is covered on its own, but not both together
+    chain.pending_transactions = [
+        Transaction(PRODUCER, BUYER, 60, "transfer"),
+        Transaction(PRODUCER, BUYER, 60, "transfer"),
+    ]
+    with pytest.raises(ValueError, match="Insufficient balance"):
+        chain.mine_pending_transactions()
+
+
+@pytest.mark.parametrize("tx", [
+    Transaction(PRODUCER, BUYER, 500, "transfer"),
+    Transaction(PRODUCER, BUYER, 0, "transfer"),
+    Transaction(PRODUCER, BUYER, 10, "mint"),
+])
+def test_rejected_block_leaves_chain_and_aggregates_unchanged(tx):
+    chain = GreenHydrogenBlockchain()
+    issue(chain, PRODUCER, 100, "Solar PV")
+    aggregates = chain.aggregates
+    blocks_before = list(chain.chain)
+    balances_before = dict(aggregates.balances)
+    holdings_before = {address: dict(h) for address, h in aggregates.holdings.items()}
+    stats_before = {address: dict(s) for address, s in aggregates.wallet_stats.items()}
+
+    chain.pending_transactions = [tx]
+    with pytest.raises(ValueError):
+        chain.mine_pending_transactions()
+
+    assert chain.chain == blocks_before
+    assert chain.pending_transactions == []
+    assert dict(aggregates.balances) == balances_before
+    assert aggregates.holdings == holdings_before
+    assert aggregates.wallet_stats == stats_before
+    assert aggregates.supply_by_source == {"Solar PV": 100}
+    assert (aggregates.total_issued, aggregates.total_retired) == (100, 0)
+    assert aggregates.is_conserved()
+
+
+def test_balances_are_read_only():
+    chain = GreenHydrogenBlockchain()
+    issue(chain, PRODUCER, 100, "Solar PV")
+    with pytest.raises(TypeError):
+        chain.balances[PRODUCER] = 1